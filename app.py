@@ -10,7 +10,7 @@ from config.auth import can_access_page
 # Page configuration
 st.set_page_config(
     page_title="MIVA - MIND Platform",
-    page_icon="assets/miva_logo_dark.png",  # Will show in browser tab
+    page_icon="static/miva_logo_dark.png",  # Will show in browser tab
     layout="wide",
     initial_sidebar_state="expanded"
 )
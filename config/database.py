@@ -5,46 +5,172 @@ Handles connection and query execution for MIND Platform
 
 import streamlit as st
 from google.cloud import bigquery
+from google.cloud import bigquery_storage
 from google.oauth2 import service_account
 import pandas as pd
-from typing import Optional
+import pyarrow as pa
+from typing import Any, Callable, Dict, List, Optional
 import json
+import threading
+
+
+@st.cache_resource(show_spinner=False)
+def _get_credentials() -> service_account.Credentials:
+    """Parse the service account key from Streamlit secrets once per process"""
+    return service_account.Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"]
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _create_bigquery_client() -> bigquery.Client:
+    """
+    Build the BigQuery client once per process
+    Raises on failure so a broken client is never cached
+    """
+    return bigquery.Client(
+        credentials=_get_credentials(),
+        project=st.secrets["gcp_service_account"]["project_id"],
+        location="europe-west3"  # As per the notebook
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _create_bqstorage_client() -> bigquery_storage.BigQueryReadClient:
+    """Build the BigQuery Storage read client once per process"""
+    return bigquery_storage.BigQueryReadClient(credentials=_get_credentials())
 
 
 def get_bigquery_client():
     """
-    Initialize and return BigQuery client with credentials
+    Return the shared BigQuery client with credentials
     Uses Streamlit secrets for secure credential management
     """
     try:
-        # Get credentials from Streamlit secrets
-        credentials = service_account.Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"]
-        )
-        
-        client = bigquery.Client(
-            credentials=credentials,
-            project=st.secrets["gcp_service_account"]["project_id"],
-            location="europe-west3"  # As per the notebook
-        )
-        
-        return client
+        return _create_bigquery_client()
     except Exception as e:
         st.error(f"Failed to initialize BigQuery client: {str(e)}")
         return None
 
 
-def run_query(sql: str, use_cache: bool = True) -> Optional[pd.DataFrame]:
+def get_bqstorage_client() -> Optional[bigquery_storage.BigQueryReadClient]:
+    """
+    Return the shared BigQuery Storage client used to download results as Arrow
+    Returns None when unavailable so callers fall back to the REST API
+    """
+    try:
+        return _create_bqstorage_client()
+    except Exception:
+        return None
+
+
+# Arrow -> pandas dtypes: strings stay Arrow-backed, and INT64/BOOL columns
+# keep the nullable dtypes QueryJob.to_dataframe() gives them, so a NULL
+# doesn't turn them into float64/object
+_PANDAS_DTYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+
+def to_dataframe(query_job: bigquery.QueryJob) -> pd.DataFrame:
+    """
+    Download query results as Arrow and convert them to a DataFrame
+    String columns stay Arrow-backed instead of becoming Python objects
+    """
+    table = query_job.to_arrow(
+        bqstorage_client=get_bqstorage_client(),
+        create_bqstorage_client=False
+    )
+    return table.to_pandas(
+        types_mapper=_PANDAS_DTYPES.get,
+        split_blocks=True,
+        self_destruct=True
+    )
+
+
+class _Flight:
+    """One in-progress call: waiters block on done, then read ok/result/error"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+
+
+# Calls currently executing, keyed by what they run, so concurrent callers
+# share one BigQuery job
+_inflight: Dict[Any, _Flight] = {}
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(key: Any, func: Callable[[], Any]) -> Any:
+    """
+    Run func(), or wait for the result of a call with the same key that is
+    already in progress
+    
+    Prevents concurrent sessions from starting duplicate BigQuery jobs (each
+    billed for its scanned bytes) for the same query.
+    """
+    while True:
+        with _inflight_lock:
+            flight = _inflight.get(key)
+            is_owner = flight is None
+            if is_owner:
+                flight = _Flight()
+                _inflight[key] = flight
+        
+        if is_owner:
+            break
+        
+        flight.done.wait()
+        if flight.ok:
+            return flight.result
+        if flight.error is not None:
+            raise flight.error
+        # The owner was interrupted by its own session (e.g. Streamlit's
+        # rerun/stop exceptions) - don't propagate that here, run it again
+    
+    try:
+        flight.result = func()
+        flight.ok = True
+        return flight.result
+    except Exception as e:
+        # Only ordinary errors are shared; BaseExceptions stay in this thread
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+
+
+def run_query(sql: str, params: Optional[Dict[str, Any]] = None,
+              use_cache: bool = True) -> Optional[pd.DataFrame]:
     """
     Execute a SQL query and return results as DataFrame
     
+    Identical queries already running in another session are awaited
+    instead of being submitted again. User input should be passed in params
+    and bound by BigQuery rather than formatted into the SQL string.
+    
     Args:
-        sql: SQL query string (SELECT or WITH only)
-        use_cache: Whether to use Streamlit's caching
+        sql: SQL query string (SELECT or WITH only), may use @name placeholders
+        params: Optional mapping of placeholder name to value
+        use_cache: Whether BigQuery may serve the query from its result cache
         
     Returns:
         pandas DataFrame with query results or None on error
     """
+    key = ("query", sql, tuple(sorted((params or {}).items())), use_cache)
+    return _single_flight(key, lambda: _run_query(sql, params, use_cache))
+
+
+def _run_query(sql: str, params: Optional[Dict[str, Any]],
+               use_cache: bool) -> Optional[pd.DataFrame]:
+    """Execute a SQL query, see run_query()"""
     # Security check - only allow SELECT and WITH queries
     if not sql.strip().lower().startswith(("select", "with")):
         st.error("Only SELECT and WITH queries are allowed")
@@ -54,29 +180,133 @@ def run_query(sql: str, use_cache: bool = True) -> Optional[pd.DataFrame]:
         client = get_bigquery_client()
         if client is None:
             return None
-            
-        # Execute query with optional caching
-        if use_cache:
-            query_job = client.query(sql)
-            df = query_job.to_dataframe()
-        else:
-            query_job = client.query(sql)
-            df = query_job.to_dataframe()
-            
-        return df
+        
+        job_config = bigquery.QueryJobConfig(
+            use_query_cache=use_cache,
+            query_parameters=_query_parameters(params or {})
+        )
+        query_job = client.query(sql, job_config=job_config)
+        return to_dataframe(query_job)
     
     except Exception as e:
         st.error(f"Query execution failed: {str(e)}")
         return None
 
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def get_cached_query(sql: str) -> Optional[pd.DataFrame]:
+def _query_parameters(params: Dict[str, Any]) -> List[bigquery.ScalarQueryParameter]:
+    """Convert a dict of Python values into BigQuery scalar query parameters"""
+    types = {bool: "BOOL", int: "INT64", float: "FLOAT64"}
+    return [
+        bigquery.ScalarQueryParameter(name, types.get(type(value), "STRING"), value)
+        for name, value in params.items()
+    ]
+
+
+def run_query_stream(sql: str, params: Optional[Dict[str, Any]] = None,
+                     page_size: int = 5000) -> Optional[pa.Table]:
+    """
+    Execute a SQL query and return results as an Arrow table
+    
+    Results are streamed as record batches and never converted to pandas,
+    which keeps peak memory down for large tables. st.dataframe accepts
+    the returned table directly.
+    
+    Args:
+        sql: SQL query string (SELECT or WITH only), may use @name placeholders
+        params: Optional mapping of placeholder name to value
+        page_size: Rows per page when falling back to the REST API
+        
+    Returns:
+        pyarrow Table with query results or None on error
+    """
+    if not sql.strip().lower().startswith(("select", "with")):
+        st.error("Only SELECT and WITH queries are allowed")
+        return None
+    
+    try:
+        client = get_bigquery_client()
+        if client is None:
+            return None
+        
+        job_config = bigquery.QueryJobConfig(query_parameters=_query_parameters(params or {}))
+        rows = client.query(sql, job_config=job_config).result(page_size=page_size)
+        batches = list(rows.to_arrow_iterable(bqstorage_client=get_bqstorage_client()))
+        if not batches:
+            # Empty result - let BigQuery build a table with the right schema
+            return rows.to_arrow(create_bqstorage_client=False)
+        return pa.Table.from_batches(batches)
+    
+    except Exception as e:
+        st.error(f"Query execution failed: {str(e)}")
+        return None
+
+
+def run_queries_parallel(sqls: Dict[str, str]) -> Dict[str, Optional[pd.DataFrame]]:
     """
-    Execute query with caching for better performance
+    Execute several queries concurrently and return their results by key
+    
+    All jobs are submitted before any result is awaited, so BigQuery runs
+    them side by side and the wall-clock cost is roughly the slowest query.
+    
+    Args:
+        sqls: Mapping of result key to SQL query string (SELECT or WITH only)
+        
+    Returns:
+        Mapping of the same keys to DataFrames, or None for failed queries
+    """
+    results = {key: None for key in sqls}
+    
+    client = get_bigquery_client()
+    if client is None:
+        return results
+    
+    # Submit every job first - client.query() returns without waiting
+    jobs = {}
+    for key, sql in sqls.items():
+        if not sql.strip().lower().startswith(("select", "with")):
+            st.error("Only SELECT and WITH queries are allowed")
+            continue
+        try:
+            jobs[key] = client.query(sql)
+        except Exception as e:
+            st.error(f"Query execution failed: {str(e)}")
+    
+    # Then collect results as each job finishes
+    for key, query_job in jobs.items():
+        try:
+            results[key] = to_dataframe(query_job)
+        except Exception as e:
+            st.error(f"Query execution failed: {str(e)}")
+    
+    return results
+
+
+# Cache for 1 hour, bounded so memory stays flat across many dashboard sessions
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def get_cached_query(sql: str, params: Optional[Dict[str, Any]] = None) -> Optional[pd.DataFrame]:
+    """
+    Execute a (optionally parameterized) query with caching for better performance
     Use this for queries that don't change frequently
     """
-    return run_query(sql, use_cache=True)
+    return run_query(sql, params, use_cache=True)
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def get_cached_queries(sqls: Dict[str, str]) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Execute a batch of queries in parallel with caching
+    Use this for dashboard sections that need several independent queries
+    """
+    return run_queries_parallel(sqls)
+
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def get_cached_query_stream(sql: str, params: Optional[Dict[str, Any]] = None) -> Optional[pa.Table]:
+    """
+    Execute a (optionally parameterized) query with caching, as an Arrow table
+    Use this for large result sets that are displayed without pandas processing
+    """
+    return run_query_stream(sql, params)
 
 
 # Dataset configuration
@@ -97,15 +327,21 @@ def get_table_list() -> list:
 
 def test_connection() -> bool:
     """Test database connection"""
+    return _single_flight(("test_connection",), _test_connection)
+
+
+def _test_connection() -> bool:
+    """Dry-run a query against the dataset, see test_connection()"""
     try:
         client = get_bigquery_client()
         if client is None:
             return False
             
-        # Simple test query
-        query = f"SELECT COUNT(*) as count FROM `{DATASET_ID}.user` LIMIT 1"
-        result = client.query(query).to_dataframe()
-        return True
+        # Dry run: validates credentials and dataset access without scanning
+        query = f"SELECT 1 FROM `{DATASET_ID}.user` LIMIT 0"
+        job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        job = client.query(query, job_config=job_config)
+        return job.total_bytes_processed is not None
     except Exception as e:
         st.error(f"Connection test failed: {str(e)}")
         return False
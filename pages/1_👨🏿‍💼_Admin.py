@@ -7,10 +7,10 @@ import streamlit as st
 import pandas as pd
 import os
 from datetime import datetime, timedelta
-from google.cloud import bigquery
-from google.oauth2 import service_account
+from typing import Final, Mapping, Optional
 import plotly.express as px
 import plotly.graph_objects as go
+from streamlit_autorefresh import st_autorefresh
 
 # Import auth functions directly
 import sys
@@ -20,6 +20,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 try:
     from utils.auth_handler import require_authentication, show_user_info_sidebar, get_current_user
     from config.auth import can_access_page
+    from config.database import get_cached_queries, get_cached_query, get_cached_query_stream
+    from utils.chart_components import table_to_csv_bytes, to_csv_bytes
+    from utils.query_builder import QueryBuilder
 except:
     st.error("Import error - please check file structure")
     st.stop()
@@ -40,7 +43,7 @@ if not can_access_page(user['role'], 'Admin'):
 
 # Theme toggle and logo display
 try:
-    import base64
+    from utils.logo_handler import display_logo
     
     # Initialize theme in session state if not exists
     if 'theme' not in st.session_state:
@@ -60,24 +63,8 @@ try:
                     st.session_state.theme = 'dark'
                     st.rerun()
     
-    # Select appropriate logo based on theme
-    if st.session_state.theme == 'dark':
-        LOGO_PATH = "/mount/src/mind-platform/assets/miva_logo_light.png"
-    else:
-        LOGO_PATH = "/mount/src/mind-platform/assets/miva_logo_dark.png"
-    
-    # Display logo
-    try:
-        with open(LOGO_PATH, "rb") as f:
-            logo_b64 = base64.b64encode(f.read()).decode()
-        
-        st.sidebar.markdown(f"""
-            <div style="margin-bottom: 1rem;">
-                <img src="data:image/png;base64,{logo_b64}" width="180" alt="MIVA Logo">
-            </div>
-        """, unsafe_allow_html=True)
-    except:
-        pass
+    # Display logo based on theme
+    display_logo(st.session_state.theme == 'dark')
     
     # Apply theme CSS
     if st.session_state.theme == 'light':
@@ -147,38 +134,34 @@ except Exception:
 # Sidebar user info
 show_user_info_sidebar()
 
-# Database connection
-@st.cache_resource
-def get_db_client():
-    """Get BigQuery client"""
-    try:
-        credentials = service_account.Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"]
-        )
-        return bigquery.Client(
-            credentials=credentials,
-            project=st.secrets["gcp_service_account"]["project_id"],
-            location="europe-west3"
-        )
-    except Exception as e:
-        st.error(f"Database connection failed: {str(e)}")
-        return None
-
-@st.cache_data(ttl=3600)
-def run_query(sql):
-    """Execute query with caching"""
-    client = get_db_client()
-    if client is None:
-        return None
-    try:
-        return client.query(sql).to_dataframe()
-    except Exception as e:
-        st.error(f"Query failed: {str(e)}")
-        return None
+def first_row(df):
+    """First row of a result as a plain dict, {} if there is none"""
+    # to_dict('records') keeps each column's own type, unlike df.iloc[0]
+    # which upcasts a mixed int/float row to float
+    return {} if df is None or df.empty else df.to_dict('records')[0]
 
 # Constants
 DATASET_ID = "gen-lang-client-0625543859.mind_analytics"
 
+# Sidebar time periods in days; None means no date filter at all
+DAYS_MAP: Final[Mapping[str, Optional[int]]] = {
+    "Last 7 Days": 7,
+    "Last 30 Days": 30,
+    "Last 90 Days": 90,
+    "All Time": None
+}
+
+# Query shared by more than one tab
+GRADE_SUMMARY_SQL = f"""
+    SELECT 
+        ROUND(AVG(final_score), 2) as avg_grade,
+        ROUND(MIN(final_score), 2) as min_grade,
+        ROUND(MAX(final_score), 2) as max_grade,
+        COUNT(*) as total_grades
+    FROM `{DATASET_ID}.grades`
+    WHERE final_score IS NOT NULL
+"""
+
 # Chart helper functions
 def plot_line_chart(df, x, y, title, height=400):
     fig = px.line(df, x=x, y=y, title=title, template=('plotly' if st.session_state.get('theme') == 'light' else 'plotly_dark'), height=height)
@@ -272,90 +255,58 @@ with st.sidebar:
     
     date_range = st.selectbox(
         "Time Period",
-        ["Last 7 Days", "Last 30 Days", "Last 90 Days", "All Time"],
+        list(DAYS_MAP),
         index=1
     )
     
-    days_map = {
-        "Last 7 Days": 7,
-        "Last 30 Days": 30,
-        "Last 90 Days": 90,
-        "All Time": 9999
-    }
-    days = days_map[date_range]
+    days = DAYS_MAP[date_range]
     
     st.markdown("---")
     auto_refresh = st.checkbox("Auto-refresh (30s)", value=False)
     if auto_refresh:
-        st.rerun()
-
-# Main content tabs
-tabs = st.tabs([
-    "📊 Overview",
-    "👥 User Analytics",
-    "👨🏿‍🎓 Learning Metrics",
-    "🤖 AI Resources",
-    "🏥 System Health",
-    "⚙️ Settings"
-])
+        # Schedules a browser-side rerun every 30s instead of rerunning immediately
+        st_autorefresh(interval=30_000, key="admin_refresh")
 
 # TAB 1: OVERVIEW
-with tabs[0]:
+def render_overview():
+    """Executive KPIs and platform trends"""
     st.markdown("## 📊 Executive Overview")
     
+    # Get metrics - Using correct table: "user" not "users"
+    # Note: sessions table might use 'user_email' instead of 'user_id'
+    kpis = get_cached_queries({
+        'total_users': f"SELECT COUNT(DISTINCT user_id) as count FROM `{DATASET_ID}.user`",
+        'active_users': f"""
+            SELECT COUNT(DISTINCT user_email) as count 
+            FROM `{DATASET_ID}.sessions`
+            {"" if days is None else f"WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)"}
+        """,
+        'total_sessions': f"SELECT COUNT(*) as count FROM `{DATASET_ID}.sessions`",
+        'avg_grade': GRADE_SUMMARY_SQL,
+        'system_health': QueryBuilder.get_system_health()
+    })
+    
     col1, col2, col3, col4, col5 = st.columns(5)
     
-    # Get metrics - Using correct table: "user" not "users"
     with col1:
-        df = run_query(f"SELECT COUNT(DISTINCT user_id) as count FROM `{DATASET_ID}.user`")
-        if df is not None and not df.empty:
-            st.metric("Total Users", f"{df['count'].iloc[0]:,}")
-        else:
-            st.metric("Total Users", "N/A")
+        row = first_row(kpis['total_users'])
+        st.metric("Total Users", f"{row['count']:,}" if row else "N/A")
     
     with col2:
-        # Note: sessions table might use 'user_email' instead of 'user_id'
-        df = run_query(f"""
-            SELECT COUNT(DISTINCT user_email) as count 
-            FROM `{DATASET_ID}.sessions`
-            WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)
-        """)
-        if df is not None and not df.empty:
-            st.metric(f"Active Users ({date_range})", f"{df['count'].iloc[0]:,}")
-        else:
-            st.metric(f"Active Users ({date_range})", "N/A")
+        row = first_row(kpis['active_users'])
+        st.metric(f"Active Users ({date_range})", f"{row['count']:,}" if row else "N/A")
     
     with col3:
-        df = run_query(f"SELECT COUNT(*) as count FROM `{DATASET_ID}.sessions`")
-        if df is not None and not df.empty:
-            st.metric("Total Sessions", f"{df['count'].iloc[0]:,}")
-        else:
-            st.metric("Total Sessions", "N/A")
+        row = first_row(kpis['total_sessions'])
+        st.metric("Total Sessions", f"{row['count']:,}" if row else "N/A")
     
     with col4:
-        df = run_query(f"""
-            SELECT ROUND(AVG(final_score), 1) as avg_score 
-            FROM `{DATASET_ID}.grades`
-            WHERE final_score IS NOT NULL
-        """)
-        if df is not None and not df.empty:
-            st.metric("Average Grade", f"{df['avg_score'].iloc[0]}%")
-        else:
-            st.metric("Average Grade", "N/A")
+        row = first_row(kpis['avg_grade'])
+        st.metric("Average Grade", f"{row['avg_grade']:.1f}%" if row else "N/A")
     
     with col5:
-        df = run_query(f"""
-            SELECT 
-                COUNT(*) as total_requests,
-                COUNTIF(derived_is_error = TRUE) as error_count
-            FROM `{DATASET_ID}.backend_telemetry`
-            WHERE created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
-        """)
-        if df is not None and not df.empty and df['total_requests'].iloc[0] > 0:
-            error_rate = (df['error_count'].iloc[0] / df['total_requests'].iloc[0] * 100)
-            st.metric("Error Rate", f"{error_rate:.2f}%", delta=f"-{error_rate:.1f}%" if error_rate < 5 else None)
-        else:
-            st.metric("Error Rate", "N/A")
+        error_rate = first_row(kpis['system_health']).get('error_rate_pct')
+        st.metric("Error Rate", f"{error_rate:.2f}%" if pd.notna(error_rate) else "N/A")
     
     st.markdown("---")
     
@@ -364,12 +315,12 @@ with tabs[0]:
     
     with col1:
         st.markdown("### 📈 Daily Active Users Trend")
-        df = run_query(f"""
+        df = get_cached_query(f"""
             SELECT 
-                DATE(start_time) as date,
+                date,
                 COUNT(DISTINCT user_email) as active_users
-            FROM `{DATASET_ID}.sessions`
-            WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)
+            FROM `{DATASET_ID}.mv_daily_user_sessions`
+            {"" if days is None else f"WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL {days} DAY)"}
             GROUP BY date
             ORDER BY date
         """)
@@ -381,19 +332,9 @@ with tabs[0]:
     
     with col2:
         st.markdown("### 📊 Grade Distribution")
-        df = run_query(f"""
-            SELECT 
-                CASE 
-                    WHEN final_score >= 90 THEN 'A (90-100)'
-                    WHEN final_score >= 80 THEN 'B (80-89)'
-                    WHEN final_score >= 70 THEN 'C (70-79)'
-                    WHEN final_score >= 60 THEN 'D (60-69)'
-                    ELSE 'F (Below 60)'
-                END as grade_bracket,
-                COUNT(*) as count
-            FROM `{DATASET_ID}.grades`
-            WHERE final_score IS NOT NULL
-            GROUP BY grade_bracket
+        df = get_cached_query(f"""
+            SELECT grade_bracket, count
+            FROM `{DATASET_ID}.mv_grade_distribution`
             ORDER BY grade_bracket
         """)
         if df is not None and not df.empty:
@@ -405,13 +346,9 @@ with tabs[0]:
     # Charts row 2 - Case Study Engagement
     st.markdown("---")
     st.markdown("### 🎯 Case Study Engagement: Total Completions")
-    df = run_query(f"""
-        SELECT 
-            c.title as case_study,
-            COUNT(g._id) as completions
-        FROM `{DATASET_ID}.grades` g
-        JOIN `{DATASET_ID}.casestudy` c ON g.case_study = c.case_study_id
-        GROUP BY c.title
+    df = get_cached_query(f"""
+        SELECT case_study, completions
+        FROM `{DATASET_ID}.mv_case_study_completions`
         ORDER BY completions DESC
     """)
     if df is not None and not df.empty:
@@ -449,14 +386,13 @@ with tabs[0]:
     # Charts row 3 - Session Engagement
     st.markdown("---")
     st.markdown("### 📱 Session Engagement Metrics")
-    df = run_query(f"""
+    df = get_cached_query(f"""
         SELECT 
-            DATE(start_timestamp) as date,
-            ROUND(AVG(session_duration_seconds / 60.0), 2) as avg_duration_minutes,
-            ROUND(AVG(pageview_count), 2) as avg_pageviews
-        FROM `{DATASET_ID}.session_analytics`
-        WHERE start_timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
-        GROUP BY date
+            date,
+            ROUND(avg_duration_minutes, 2) as avg_duration_minutes,
+            ROUND(avg_pageviews, 2) as avg_pageviews
+        FROM `{DATASET_ID}.mv_daily_session_engagement`
+        WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)
         ORDER BY date
     """)
     if df is not None and not df.empty:
@@ -473,7 +409,7 @@ with tabs[0]:
     
     with col1:
         st.markdown("### 📈 Platform Growth & Retention: Weekly Active Users")
-        df = run_query(f"""
+        df = get_cached_query(f"""
             WITH user_first_appearance AS (
                 SELECT 
                     distinct_id, 
@@ -552,7 +488,7 @@ with tabs[0]:
     
     with col2:
         st.markdown("### 📊 Case Study Activity: Weekly Volume")
-        df = run_query(f"""
+        df = get_cached_query(f"""
             SELECT 
                 TIMESTAMP_TRUNC(timestamp, WEEK) as week_start,
                 COUNT(*) as attempt_count
@@ -592,52 +528,48 @@ with tabs[0]:
             st.info("No weekly activity data available")
 
 # TAB 2: USER ANALYTICS
-with tabs[1]:
+def render_user_analytics():
+    """User counts and student performance tables"""
     st.markdown("## 👥 User Analytics")
     
     # User stats
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        df = run_query(f"SELECT COUNT(*) as count FROM `{DATASET_ID}.user`")
-        if df is not None and not df.empty:
-            st.metric("Total Users", f"{df['count'].iloc[0]:,}")
-        else:
-            st.metric("Total Users", "N/A")
-    
-    with col2:
-        df = run_query(f"""
+    kpis = get_cached_queries({
+        'total_users': f"SELECT COUNT(*) as count FROM `{DATASET_ID}.user`",
+        'roles': f"""
             SELECT COUNT(DISTINCT role) as roles 
             FROM `{DATASET_ID}.user` 
             WHERE role IS NOT NULL
-        """)
-        if df is not None and not df.empty:
-            st.metric("User Roles", f"{df['roles'].iloc[0]}")
-        else:
-            st.metric("User Roles", "N/A")
-    
-    with col3:
-        df = run_query(f"""
+        """,
+        'depts': f"""
             SELECT COUNT(DISTINCT department) as depts 
             FROM `{DATASET_ID}.user` 
             WHERE department IS NOT NULL
-        """)
-        if df is not None and not df.empty:
-            st.metric("Departments", f"{df['depts'].iloc[0]}")
-        else:
-            st.metric("Departments", "N/A")
-    
-    with col4:
-        df = run_query(f"""
+        """,
+        'active_students': f"""
             SELECT COUNT(DISTINCT u.user_id) as active_students
             FROM `{DATASET_ID}.user` u
             JOIN `{DATASET_ID}.grades` g ON u.user_id = g.user
             WHERE g.timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
-        """)
-        if df is not None and not df.empty:
-            st.metric("Active Students (30d)", f"{df['active_students'].iloc[0]:,}")
-        else:
-            st.metric("Active Students (30d)", "N/A")
+        """
+    })
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        row = first_row(kpis['total_users'])
+        st.metric("Total Users", f"{row['count']:,}" if row else "N/A")
+    
+    with col2:
+        row = first_row(kpis['roles'])
+        st.metric("User Roles", f"{row['roles']}" if row else "N/A")
+    
+    with col3:
+        row = first_row(kpis['depts'])
+        st.metric("Departments", f"{row['depts']}" if row else "N/A")
+    
+    with col4:
+        row = first_row(kpis['active_students'])
+        st.metric("Active Students (30d)", f"{row['active_students']:,}" if row else "N/A")
     
     st.markdown("---")
     
@@ -645,7 +577,7 @@ with tabs[1]:
     
     with col1:
         st.markdown("### 📊 Performance by Department")
-        df = run_query(f"""
+        df = get_cached_query(f"""
             SELECT 
                 u.department,
                 COUNT(DISTINCT u.user_id) as student_count,
@@ -666,14 +598,14 @@ with tabs[1]:
                                'Average Score by Department', height=300)
             st.plotly_chart(fig, use_container_width=True)
             
-            csv = df.to_csv(index=False).encode('utf-8')
+            csv = to_csv_bytes(df)
             st.download_button("📥 Download CSV", csv, "department_performance.csv", "text/csv")
         else:
             st.info("No department data available")
     
     with col2:
         st.markdown("### 📊 Performance by Role")
-        df = run_query(f"""
+        df = get_cached_query(f"""
             SELECT 
                 u.role,
                 COUNT(DISTINCT u.user_id) as user_count,
@@ -694,7 +626,7 @@ with tabs[1]:
                                'Average Score by Role', height=300)
             st.plotly_chart(fig, use_container_width=True)
             
-            csv = df.to_csv(index=False).encode('utf-8')
+            csv = to_csv_bytes(df)
             st.download_button("📥 Download CSV", csv, "role_performance.csv", "text/csv")
         else:
             st.info("No role data available")
@@ -707,21 +639,24 @@ with tabs[1]:
     with col1:
         search_name = st.text_input("🔍 Search by Name", "")
     with col2:
-        dept_filter = st.selectbox("Filter by Department", ["All"] + [
-            dept for dept in run_query(f"SELECT DISTINCT department FROM `{DATASET_ID}.user` WHERE department IS NOT NULL ORDER BY department")['department'].tolist()
-        ] if run_query(f"SELECT DISTINCT department FROM `{DATASET_ID}.user` WHERE department IS NOT NULL") is not None else ["All"])
+        dept_df = get_cached_query(f"SELECT DISTINCT department FROM `{DATASET_ID}.user` WHERE department IS NOT NULL ORDER BY department")
+        dept_options = ["All"] + (dept_df['department'].tolist() if dept_df is not None else [])
+        dept_filter = st.selectbox("Filter by Department", dept_options)
     
-    # Build query with filters
+    # Build query with filters - values are bound as query parameters
     where_clauses = ["g.final_score IS NOT NULL"]
+    params = {}
     if search_name:
         # Note: Using just 'name' without student_email due to schema inconsistencies
-        where_clauses.append(f"LOWER(u.name) LIKE '%{search_name.lower()}%'")
+        where_clauses.append("STRPOS(LOWER(u.name), @search) > 0")
+        params['search'] = search_name.lower()
     if dept_filter != "All":
-        where_clauses.append(f"u.department = '{dept_filter}'")
+        where_clauses.append("u.department = @department")
+        params['department'] = dept_filter
     
     where_clause = " AND ".join(where_clauses)
     
-    df = run_query(f"""
+    sql = f"""
         SELECT 
             u.name as student_name,
             u.department,
@@ -736,50 +671,44 @@ with tabs[1]:
         WHERE {where_clause}
         GROUP BY u.user_id, u.name, u.department, u.role
         ORDER BY avg_score DESC
-    """)
+    """
+    table = get_cached_query_stream(sql, params)
     
-    if df is not None and not df.empty:
-        st.dataframe(df, use_container_width=True, height=400)
+    if table is not None and table.num_rows > 0:
+        st.dataframe(table, use_container_width=True, height=400)
         
-        csv = df.to_csv(index=False).encode('utf-8')
+        csv = table_to_csv_bytes(table, (sql, params))
         st.download_button("📥 Download Full Report", csv, "student_performance.csv", "text/csv")
         
-        st.info(f"**{len(df)} students** found")
+        st.info(f"**{table.num_rows} students** found")
     else:
         st.info("No student performance data available")
 
 # TAB 3: LEARNING METRICS
-with tabs[2]:
+def render_learning_metrics():
+    """Score ranges, at-risk students and top performers"""
     st.markdown("## 👨🏿‍🎓 Learning Analytics")
     
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
     
-    df = run_query(f"""
-        SELECT 
-            ROUND(AVG(final_score), 2) as avg_grade,
-            ROUND(MIN(final_score), 2) as min_grade,
-            ROUND(MAX(final_score), 2) as max_grade,
-            COUNT(*) as total_grades
-        FROM `{DATASET_ID}.grades`
-        WHERE final_score IS NOT NULL
-    """)
+    grades = first_row(get_cached_query(GRADE_SUMMARY_SQL))
     
-    if df is not None and not df.empty:
+    if grades:
         with col1:
-            st.metric("Average Score", f"{df['avg_grade'].iloc[0]:.1f}%")
+            st.metric("Average Score", f"{grades['avg_grade']:.1f}%")
         with col2:
-            st.metric("Minimum Score", f"{df['min_grade'].iloc[0]:.1f}%")
+            st.metric("Minimum Score", f"{grades['min_grade']:.1f}%")
         with col3:
-            st.metric("Maximum Score", f"{df['max_grade'].iloc[0]:.1f}%")
+            st.metric("Maximum Score", f"{grades['max_grade']:.1f}%")
         with col4:
-            st.metric("Total Grades", f"{df['total_grades'].iloc[0]:,}")
+            st.metric("Total Grades", f"{grades['total_grades']:,}")
     
     st.markdown("---")
     
     # NEW CHART: Institutional Performance Score Ranges
     st.markdown("### 📊 Institutional Performance: Effective Score Ranges")
-    df = run_query(f"""
+    df = get_cached_query(f"""
         SELECT 
             c.title, 
             MIN(CASE WHEN g.final_score > 0 THEN g.final_score END) as min_score,
@@ -871,7 +800,7 @@ with tabs[2]:
     
     with col1:
         st.markdown("### ⚠️ Students at Risk")
-        df = run_query(f"""
+        df = get_cached_query(f"""
             SELECT 
                 u.name as student_name,
                 u.department,
@@ -888,7 +817,7 @@ with tabs[2]:
         """)
         if df is not None and not df.empty:
             st.dataframe(df, use_container_width=True, height=400)
-            csv = df.to_csv(index=False).encode('utf-8')
+            csv = to_csv_bytes(df)
             st.download_button("📥 Download CSV", csv, "students_at_risk.csv", "text/csv")
             st.warning(f"**{len(df)} students** are currently below 60% average")
         else:
@@ -896,7 +825,7 @@ with tabs[2]:
     
     with col2:
         st.markdown("### 🏆 Top Performers")
-        df = run_query(f"""
+        df = get_cached_query(f"""
             SELECT 
                 u.name as student_name,
                 u.department,
@@ -913,38 +842,34 @@ with tabs[2]:
         """)
         if df is not None and not df.empty:
             st.dataframe(df, use_container_width=True, height=400)
-            csv = df.to_csv(index=False).encode('utf-8')
+            csv = to_csv_bytes(df)
             st.download_button("📥 Download CSV", csv, "top_performers.csv", "text/csv")
         else:
             st.info("No performance data available")
 
 # TAB 4: AI RESOURCES
-with tabs[3]:
+def render_ai_resources():
+    """AI token consumption and model usage"""
     st.markdown("## 🤖 AI Resource Management")
     
-    df = run_query(f"""
-        SELECT 
-            SUM(derived_ai_total_tokens) as total_tokens,
-            SUM(derived_ai_input_tokens) as input_tokens,
-            SUM(derived_ai_output_tokens) as output_tokens,
-            COUNT(DISTINCT derived_ai_model) as models_used
-        FROM `{DATASET_ID}.backend_telemetry`
-        WHERE derived_ai_total_tokens IS NOT NULL
-    """)
+    # Token totals and per-model usage come back from one job, tagged by 'kind'
+    ai_df = get_cached_query(QueryBuilder.get_ai_dashboard_bundle())
+    
+    totals = first_row(ai_df[ai_df['kind'] == 'totals'] if ai_df is not None else None)
     
     col1, col2, col3, col4 = st.columns(4)
     
     # FIXED: Check for None/NaN values properly
-    if df is not None and not df.empty and pd.notna(df['total_tokens'].iloc[0]):
-        total = float(df['total_tokens'].iloc[0])
+    if pd.notna(totals.get('total_tokens')):
+        total = float(totals['total_tokens'])
         cost = (total / 1_000_000) * 15.0
         
         with col1:
             st.metric("Total Tokens", f"{total:,.0f}")
         with col2:
-            st.metric("Input Tokens", f"{float(df['input_tokens'].iloc[0]):,.0f}")
+            st.metric("Input Tokens", f"{float(totals['input_tokens']):,.0f}")
         with col3:
-            st.metric("Output Tokens", f"{float(df['output_tokens'].iloc[0]):,.0f}")
+            st.metric("Output Tokens", f"{float(totals['output_tokens']):,.0f}")
         with col4:
             st.metric("Estimated Cost", f"${cost:,.2f}")
     else:
@@ -964,16 +889,7 @@ with tabs[3]:
     
     with col1:
         st.markdown("### 🤖 AI Model Distribution")
-        df = run_query(f"""
-            SELECT 
-                derived_ai_model as model,
-                COUNT(*) as request_count,
-                SUM(derived_ai_total_tokens) as total_tokens
-            FROM `{DATASET_ID}.backend_telemetry`
-            WHERE derived_ai_model IS NOT NULL
-            GROUP BY model
-            ORDER BY request_count DESC
-        """)
+        df = ai_df[ai_df['kind'] == 'per_model'][['model', 'request_count', 'total_tokens']].reset_index(drop=True) if ai_df is not None else None
         if df is not None and not df.empty:
             fig = plot_bar_chart(df, 'model', 'request_count', 'Requests by AI Model', height=350)
             st.plotly_chart(fig, use_container_width=True)
@@ -986,33 +902,25 @@ with tabs[3]:
         st.info("Token usage trending chart - data pending")
 
 # TAB 5: SYSTEM HEALTH
-with tabs[4]:
+def render_system_health():
+    """Latency, uptime and recent errors"""
     st.markdown("## 🏥 System Health & Performance")
     
-    df = run_query(f"""
-        SELECT 
-            COUNT(*) as total_requests,
-            COUNTIF(derived_is_error = TRUE) as error_count,
-            ROUND(AVG(derived_response_time_ms), 2) as avg_response_time,
-            ROUND(APPROX_QUANTILES(derived_response_time_ms, 100)[OFFSET(95)], 2) as p95_latency,
-            ROUND(APPROX_QUANTILES(derived_response_time_ms, 100)[OFFSET(99)], 2) as p99_latency
-        FROM `{DATASET_ID}.backend_telemetry`
-        WHERE created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
-    """)
+    health = first_row(get_cached_query(QueryBuilder.get_system_health()))
     
-    if df is not None and not df.empty:
+    if health:
         col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
-            st.metric("Total Requests", f"{df['total_requests'].iloc[0]:,}")
+            st.metric("Total Requests", f"{health['total_requests']:,}")
         with col2:
-            st.metric("Error Count", f"{df['error_count'].iloc[0]:,}")
+            st.metric("Error Count", f"{health['error_count']:,}")
         with col3:
-            st.metric("Avg Latency", f"{df['avg_response_time'].iloc[0]:.0f}ms")
+            st.metric("Avg Latency", f"{health['avg_response_time']:.0f}ms")
         with col4:
-            st.metric("P95 Latency", f"{df['p95_latency'].iloc[0]:.0f}ms")
+            st.metric("P95 Latency", f"{health['p95_latency']:.0f}ms")
         with col5:
-            st.metric("P99 Latency", f"{df['p99_latency'].iloc[0]:.0f}ms")
+            st.metric("P99 Latency", f"{health['p99_latency']:.0f}ms")
     
     st.markdown("---")
     
@@ -1020,17 +928,15 @@ with tabs[4]:
     
     with col1:
         st.markdown("### 🚦 System Uptime")
-        if df is not None and not df.empty and df['total_requests'].iloc[0] > 0:
-            uptime = ((df['total_requests'].iloc[0] - df['error_count'].iloc[0]) / 
-                     df['total_requests'].iloc[0] * 100)
-            fig = plot_gauge(uptime, "System Uptime %", max_value=100, height=300)
+        if pd.notna(health.get('uptime_pct')):
+            fig = plot_gauge(health['uptime_pct'], "System Uptime %", max_value=100, height=300)
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No uptime data available")
     
     with col2:
         st.markdown("### ⚡ Response Time by Route")
-        df = run_query(f"""
+        df = get_cached_query(f"""
             SELECT 
                 http_route,
                 COUNT(*) as request_count,
@@ -1051,7 +957,7 @@ with tabs[4]:
     st.markdown("---")
     st.markdown("### 🐛 Recent Errors")
     
-    df = run_query(f"""
+    df = get_cached_query(f"""
         SELECT 
             created_at,
             span_name,
@@ -1066,13 +972,14 @@ with tabs[4]:
     """)
     if df is not None and not df.empty:
         st.dataframe(df, use_container_width=True, height=400)
-        csv = df.to_csv(index=False).encode('utf-8')
+        csv = to_csv_bytes(df)
         st.download_button("📥 Download CSV", csv, "error_log.csv", "text/csv")
     else:
         st.success("✅ No recent errors!")
 
 # TAB 6: SETTINGS
-with tabs[5]:
+def render_settings():
+    """Access control and data settings"""
     st.markdown("## ⚙️ System Configuration")
     
     col1, col2 = st.columns(2)
@@ -1103,6 +1010,25 @@ with tabs[5]:
         if st.button("📦 Export All Data"):
             st.info("Full data export - Coming soon")
 
+# View router - only the selected view runs its queries on each rerun
+VIEWS = {
+    "📊 Overview": render_overview,
+    "👥 User Analytics": render_user_analytics,
+    "👨🏿‍🎓 Learning Metrics": render_learning_metrics,
+    "🤖 AI Resources": render_ai_resources,
+    "🏥 System Health": render_system_health,
+    "⚙️ Settings": render_settings
+}
+
+active_view = st.radio(
+    "View",
+    list(VIEWS),
+    horizontal=True,
+    key="active_tab",
+    label_visibility="collapsed"
+)
+VIEWS[active_view]()
+
 # Footer
 st.markdown("---")
 st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Admin Dashboard v1.0")
@@ -40,7 +40,7 @@ if not can_access_page(user['role'], 'Developer'):
 
 # Theme toggle and logo display
 try:
-    import base64
+    from utils.logo_handler import display_logo
     
     # Initialize theme in session state if not exists
     if 'theme' not in st.session_state:
@@ -60,24 +60,8 @@ try:
                     st.session_state.theme = 'dark'
                     st.rerun()
     
-    # Select appropriate logo based on theme
-    if st.session_state.theme == 'dark':
-        LOGO_PATH = "/mount/src/mind-platform/assets/miva_logo_light.png"
-    else:
-        LOGO_PATH = "/mount/src/mind-platform/assets/miva_logo_dark.png"
-    
-    # Display logo
-    try:
-        with open(LOGO_PATH, "rb") as f:
-            logo_b64 = base64.b64encode(f.read()).decode()
-        
-        st.sidebar.markdown(f"""
-            <div style="margin-bottom: 1rem;">
-                <img src="data:image/png;base64,{logo_b64}" width="180" alt="MIVA Logo">
-            </div>
-        """, unsafe_allow_html=True)
-    except:
-        pass
+    # Display logo based on theme
+    display_logo(st.session_state.theme == 'dark')
     
     # Apply theme CSS
     if st.session_state.theme == 'light':
@@ -5,6 +5,8 @@ Personal Learning Journey, Performance Tracking & Progress Analytics
 
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
 from datetime import datetime, timedelta
 from google.cloud import bigquery
@@ -47,7 +49,7 @@ student_name = None     # Will be set by selector
 
 # Theme toggle and logo display
 try:
-    import base64
+    from utils.logo_handler import display_logo
     
     # Initialize theme in session state if not exists
     if 'theme' not in st.session_state:
@@ -67,24 +69,8 @@ try:
                     st.session_state.theme = 'dark'
                     st.rerun()
     
-    # Select appropriate logo based on theme
-    if st.session_state.theme == 'dark':
-        LOGO_PATH = "/mount/src/mind-platform/assets/miva_logo_light.png"
-    else:
-        LOGO_PATH = "/mount/src/mind-platform/assets/miva_logo_dark.png"
-    
-    # Display logo
-    try:
-        with open(LOGO_PATH, "rb") as f:
-            logo_b64 = base64.b64encode(f.read()).decode()
-        
-        st.sidebar.markdown(f"""
-            <div style="margin-bottom: 1rem;">
-                <img src="data:image/png;base64,{logo_b64}" width="180" alt="MIVA Logo">
-            </div>
-        """, unsafe_allow_html=True)
-    except:
-        pass
+    # Display logo based on theme
+    display_logo(st.session_state.theme == 'dark')
     
     # Apply theme CSS
     if st.session_state.theme == 'light':
@@ -749,7 +735,13 @@ with tabs[3]:
         # Apply filters
         filtered = all_scores.copy()
         if search:
-            filtered = filtered[filtered['case_study'].str.contains(search, case=False, na=False)]
+            # Literal, case-insensitive substring match in Arrow compute (no regex compile)
+            matches = pc.match_substring(
+                pa.array(filtered['case_study'], type=pa.string(), from_pandas=True),
+                search,
+                ignore_case=True
+            )
+            filtered = filtered[matches.fill_null(False).to_numpy(zero_copy_only=False)]
         filtered = filtered[filtered['final_score'] >= min_score]
         
         # Display
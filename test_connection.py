@@ -7,6 +7,39 @@ import streamlit as st
 from google.cloud import bigquery
 from google.oauth2 import service_account
 
+
+@st.cache_resource(show_spinner=False)
+def _creds():
+    """Parse the service account key once per process"""
+    return service_account.Credentials.from_service_account_info(
+        dict(st.secrets["gcp_service_account"])
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _get_bq_client(project_id: str, location: str):
+    """Create the BigQuery client once per process"""
+    return bigquery.Client(
+        credentials=_creds(),
+        project=project_id,
+        location=location
+    )
+
+
+def _job_config():
+    """Use BigQuery's results cache and cap each test query at 1 GB billed"""
+    return bigquery.QueryJobConfig(
+        use_query_cache=True,
+        maximum_bytes_billed=10**9
+    )
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _run_scalar(_client, sql: str):
+    """Run a single-row test query and return its first row, skipping pandas"""
+    return dict(next(iter(_client.query(sql, job_config=_job_config()).result())))
+
+
 st.title("🔍 Database Connection Test")
 
 st.markdown("---")
@@ -27,14 +60,9 @@ st.markdown("---")
 # Test 2: Try to create BigQuery client
 st.markdown("### Test 2: Creating BigQuery Client")
 try:
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
-    
-    client = bigquery.Client(
-        credentials=credentials,
-        project=st.secrets["gcp_service_account"]["project_id"],
-        location="europe-west3"
+    client = _get_bq_client(
+        st.secrets["gcp_service_account"]["project_id"],
+        "europe-west3"
     )
     
     st.success("✅ BigQuery client created successfully")
@@ -44,44 +72,46 @@ except Exception as e:
 
 st.markdown("---")
 
+# Tests 3 and 4 share one BigQuery job: table listing and user count
+TEST_QUERY = """
+SELECT
+    ARRAY(
+        SELECT table_name
+        FROM `mind_analytics.INFORMATION_SCHEMA.TABLES`
+        ORDER BY table_name
+        LIMIT 5
+    ) AS tables,
+    (
+        SELECT COUNT(*)
+        FROM `gen-lang-client-0625543859.mind_analytics.user`
+    ) AS total_users
+"""
+
 # Test 3: Try a simple query
 st.markdown("### Test 3: Running Test Query")
+row = None
 try:
-    query = """
-    SELECT table_name
-    FROM `mind_analytics.INFORMATION_SCHEMA.TABLES`
-    ORDER BY table_name
-    LIMIT 5
-    """
-    
-    result = client.query(query).to_dataframe()
+    row = _run_scalar(client, TEST_QUERY)
     
     st.success("✅ Query executed successfully")
     st.write("**Available Tables:**")
-    st.dataframe(result)
+    st.dataframe({"table_name": row['tables']})
     
 except Exception as e:
-    st.error(f"❌ Query failed: {str(e)}")
-    st.code(str(e))
+    query_error = str(e)
+    st.error(f"❌ Query failed: {query_error}")
+    st.code(query_error)
 
 st.markdown("---")
 
 # Test 4: Count users
 st.markdown("### Test 4: Counting Users")
-try:
-    query = """
-    SELECT COUNT(*) as total_users
-    FROM `gen-lang-client-0625543859.mind_analytics.user`
-    """
-    
-    result = client.query(query).to_dataframe()
-    
+if row is not None:
     st.success("✅ User count query successful")
-    st.metric("Total Users", result['total_users'].iloc[0])
-    
-except Exception as e:
-    st.error(f"❌ User count failed: {str(e)}")
-    st.code(str(e))
+    st.metric("Total Users", row['total_users'])
+else:
+    st.error(f"❌ User count failed: {query_error}")
+    st.code(query_error)
 
 st.markdown("---")
 st.markdown("### ✅ All Tests Passed!")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Make the app's packages (utils, config) importable from the tests
+sys.path.insert(0, str(Path(__file__).parent.parent))
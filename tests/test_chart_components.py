@@ -0,0 +1,45 @@
+"""
+CSV export helpers in utils.chart_components
+"""
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from utils.chart_components import table_to_csv_bytes, to_csv_bytes
+
+
+def setup_function():
+    st.cache_data.clear()
+
+
+def test_table_to_csv_bytes_accepts_arrow_table():
+    table = pa.table({"student_name": ["Ada", "Bo"], "avg_score": [91.5, 78.0]})
+
+    csv = table_to_csv_bytes(table, ("SELECT 1", {"search": "a"}))
+
+    assert csv.decode().splitlines() == [
+        '"student_name","avg_score"',
+        '"Ada",91.5',
+        '"Bo",78',
+    ]
+
+
+def test_table_to_csv_bytes_is_cached_on_key():
+    first = pa.table({"n": [1]})
+    second = pa.table({"n": [2]})
+
+    assert table_to_csv_bytes(first, "key") == table_to_csv_bytes(second, "key")
+    assert table_to_csv_bytes(first, "key") != table_to_csv_bytes(second, "other")
+
+
+def test_to_csv_bytes_accepts_dataframe():
+    df = pd.DataFrame({"model": ["gpt", "claude"], "request_count": [3, 5]})
+
+    csv = to_csv_bytes(df)
+
+    assert csv.decode().splitlines() == [
+        '"model","request_count"',
+        '"gpt",3',
+        '"claude",5',
+    ]
@@ -106,8 +106,7 @@ def has_permission(permission: str) -> bool:
 
 def show_login_page():
     """Display login page with theme-aware MIVA logo"""
-    import base64
-    import os
+    from utils.logo_handler import get_logo_data_uri
     
     # Initialize theme if not set
     if 'theme' not in st.session_state:
@@ -182,20 +181,14 @@ def show_login_page():
     with col2:
         # Display theme-aware MIVA logo
         try:
-            # Select logo based on theme
-            if st.session_state.theme == 'dark':
-                logo_path = "/mount/src/mind-platform/assets/miva_logo_light.png"
-            else:
-                logo_path = "/mount/src/mind-platform/assets/miva_logo_dark.png"
+            # Select logo based on theme (None if the file was not found)
+            logo_src = get_logo_data_uri(st.session_state.theme == 'dark')
             
             # Try to load and display logo
-            if os.path.exists(logo_path):
-                with open(logo_path, "rb") as f:
-                    logo_b64 = base64.b64encode(f.read()).decode()
-                
+            if logo_src:
                 st.markdown(f"""
                     <div class="logo-container">
-                        <img src="data:image/png;base64,{logo_b64}" alt="MIVA Logo">
+                        <img src="{logo_src}" alt="MIVA Logo">
                     </div>
                 """, unsafe_allow_html=True)
             else:
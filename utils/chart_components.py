@@ -7,8 +7,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import streamlit as st
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 
 
 # Color schemes
@@ -361,9 +363,34 @@ def create_multi_line_chart(df: pd.DataFrame, x: str, y_columns: List[str],
     return fig
 
 
+def _write_csv(table: pa.Table) -> bytes:
+    """Serialize an Arrow table to CSV with Arrow's C++ writer"""
+    buffer = pa.BufferOutputStream()
+    pacsv.write_csv(table, buffer)
+    return buffer.getvalue().to_pybytes()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame to CSV, cached across reruns"""
+    return _write_csv(pa.Table.from_pandas(df, preserve_index=False))
+
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=32)
+def table_to_csv_bytes(_table: pa.Table, key: Any) -> bytes:
+    """
+    Serialize an Arrow table to CSV, cached across reruns
+    
+    st.cache_data cannot hash a pyarrow Table, so the cache is keyed on
+    `key` alone - pass something that identifies the table's contents,
+    such as the (sql, params) it was queried with.
+    """
+    return _write_csv(_table)
+
+
 def export_dataframe_to_csv(df: pd.DataFrame, filename: str):
     """Provide CSV download button for DataFrame"""
-    csv = df.to_csv(index=False).encode('utf-8')
+    csv = to_csv_bytes(df)
     st.download_button(
         label="📥 Download CSV",
         data=csv,
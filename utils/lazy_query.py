@@ -0,0 +1,95 @@
+"""
+Lazy Query
+Chainable SQL builder that defers execution until results are needed
+"""
+
+import copy
+from typing import Any, Dict, List, Optional
+
+
+class LazyQuery:
+    """
+    Wrap a base SELECT and fuse filters, projections, ordering and limits
+    into a single SQL statement that only runs on to_df()
+
+    Every method returns a new LazyQuery, so a base query can be shared
+    and refined by different callers without affecting each other.
+
+    Example:
+        QueryBuilder.get_student_performance_query() \\
+            .filter("STRPOS(LOWER(student_name), @search) > 0", search="ada") \\
+            .limit(10) \\
+            .to_df()
+    """
+
+    def __init__(self, base_sql: str):
+        self._base = base_sql.strip()
+        self._where: List[str] = []
+        self._params: Dict[str, Any] = {}
+        self._proj: Optional[List[str]] = None
+        self._order: Optional[str] = None
+        self._limit: Optional[int] = None
+
+    def _clone(self) -> "LazyQuery":
+        query = copy.copy(self)
+        query._where = list(self._where)
+        query._params = dict(self._params)
+        query._proj = list(self._proj) if self._proj is not None else None
+        return query
+
+    def filter(self, condition: str, **params: Any) -> "LazyQuery":
+        """
+        Add a WHERE condition over the base query's output columns
+
+        Args:
+            condition: SQL boolean expression, may use @name placeholders
+            **params: Values bound to the placeholders as query parameters
+        """
+        query = self._clone()
+        query._where.append(f"({condition})")
+        query._params.update(params)
+        return query
+
+    def select(self, *columns: str) -> "LazyQuery":
+        """Restrict the output to the given columns or expressions"""
+        query = self._clone()
+        query._proj = list(columns)
+        return query
+
+    def order_by(self, order: str) -> "LazyQuery":
+        """Set the ORDER BY clause, e.g. 'avg_score DESC'"""
+        query = self._clone()
+        query._order = order
+        return query
+
+    def limit(self, n: int) -> "LazyQuery":
+        """Limit the number of rows returned"""
+        query = self._clone()
+        query._limit = int(n)
+        return query
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """Query parameters collected from filter() calls"""
+        return dict(self._params)
+
+    def to_sql(self) -> str:
+        """Render the fused SQL statement"""
+        sql = f"SELECT {', '.join(self._proj) if self._proj else '*'}\nFROM (\n{self._base}\n)"
+        if self._where:
+            sql += f"\nWHERE {' AND '.join(self._where)}"
+        if self._order:
+            sql += f"\nORDER BY {self._order}"
+        if self._limit is not None:
+            sql += f"\nLIMIT {self._limit}"
+        return sql
+
+    def to_df(self):
+        """Execute the query on BigQuery and return a DataFrame"""
+        # Imported here to keep this module free of Streamlit/BigQuery imports
+        from config.database import get_cached_query
+
+        return get_cached_query(self.to_sql(), self._params or None)
+
+    def __str__(self) -> str:
+        return self.to_sql()
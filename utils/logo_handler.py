@@ -0,0 +1,159 @@
+"""
+Logo Handler
+Locates and displays the theme-aware MIVA logo
+"""
+
+import base64
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import streamlit as st
+
+# Streamlit Cloud checkout first, then the static folder next to this package.
+# Set MIND_ASSETS_DIR to use one known directory and skip the search.
+ASSET_DIRS = [
+    Path("/mount/src/mind-platform/static"),
+    Path(__file__).resolve().parent.parent / "static",
+]
+
+# Streamlit serves the app's ./static folder here when
+# server.enableStaticServing is on (see .streamlit/config.toml)
+STATIC_URL_PATH = "app/static"
+
+# Optional external host (e.g. a CDN) to fetch the logo from instead
+LOGO_BASE_URL = os.environ.get("MIND_LOGO_BASE_URL", "")
+
+
+@lru_cache(maxsize=2)
+def get_logo_path(dark_mode: bool = True) -> Optional[str]:
+    """
+    Find the logo file for the current theme
+
+    Args:
+        dark_mode: True for the dark theme, which uses the light logo
+
+    Returns:
+        Path to the logo file, or None if it was not found
+    """
+    filename = "miva_logo_light.png" if dark_mode else "miva_logo_dark.png"
+
+    assets_dir = os.environ.get("MIND_ASSETS_DIR")
+    asset_dirs = [Path(assets_dir)] if assets_dir else ASSET_DIRS
+
+    for asset_dir in asset_dirs:
+        path = asset_dir / filename
+        if path.is_file():
+            return str(path)
+
+    return None
+
+
+@st.cache_data(show_spinner=False)
+def _encode_logo(path: str, mtime: float) -> str:
+    """Base64-encode a logo file; mtime is part of the cache key only"""
+    return base64.b64encode(Path(path).read_bytes()).decode()
+
+
+def get_logo_base64(dark_mode: bool = True) -> Optional[str]:
+    """
+    Get the logo for the current theme as a base64 string
+
+    Args:
+        dark_mode: True for the dark theme, which uses the light logo
+
+    Returns:
+        Base64-encoded PNG, or None if the logo was not found
+    """
+    logo_path = get_logo_path(dark_mode)
+    if logo_path is None:
+        return None
+
+    # Replacing the file changes its mtime and so re-encodes it
+    return _encode_logo(logo_path, os.path.getmtime(logo_path))
+
+
+def get_logo_data_uri(dark_mode: bool = True) -> Optional[str]:
+    """
+    Get the logo for the current theme as a data URI, for <img> tags or CSS
+
+    Args:
+        dark_mode: True for the dark theme, which uses the light logo
+
+    Returns:
+        data:image/png;base64 URI, or None if the logo was not found
+    """
+    logo_b64 = get_logo_base64(dark_mode)
+    return f"data:image/png;base64,{logo_b64}" if logo_b64 else None
+
+
+def get_hosted_logo_url(dark_mode: bool = True) -> Optional[str]:
+    """
+    Get the logo URL on the MIND_LOGO_BASE_URL host for the current theme
+
+    Args:
+        dark_mode: True for the dark theme, which uses the light logo
+
+    Returns:
+        Logo URL, or None if no base URL is configured
+    """
+    if not LOGO_BASE_URL:
+        return None
+
+    filename = "miva_logo_light.png" if dark_mode else "miva_logo_dark.png"
+    return f"{LOGO_BASE_URL.rstrip('/')}/{filename}"
+
+
+def get_static_logo_url(dark_mode: bool = True) -> Optional[str]:
+    """
+    Get the logo URL on Streamlit's static file server for the current theme
+
+    Args:
+        dark_mode: True for the dark theme, which uses the light logo
+
+    Returns:
+        Relative app/static URL, or None if static serving is off or the
+        logo is not in a static folder
+    """
+    if not st.get_option("server.enableStaticServing"):
+        return None
+
+    logo_path = get_logo_path(dark_mode)
+    if logo_path is None or Path(logo_path).parent.name != "static":
+        return None
+
+    return f"{STATIC_URL_PATH}/{Path(logo_path).name}"
+
+
+def display_logo(dark_mode: bool = True, width: int = 180) -> bool:
+    """
+    Display the theme-aware logo in the sidebar
+
+    The image is served by Streamlit's static file server by default (or
+    the MIND_LOGO_BASE_URL host when set), so the browser fetches and caches
+    it once and a rerun only re-sends a short <img> tag. The file is embedded
+    as a data URI only when neither URL is available.
+
+    Args:
+        dark_mode: True for the dark theme, which uses the light logo
+        width: Display width in pixels
+
+    Returns:
+        True if a logo was displayed
+    """
+    src = (
+        get_hosted_logo_url(dark_mode)
+        or get_static_logo_url(dark_mode)
+        or get_logo_data_uri(dark_mode)
+    )
+    if src is None:
+        return False
+
+    st.sidebar.markdown(f"""
+        <div style="margin-bottom: 1rem;">
+            <img src="{src}" width="{width}" alt="MIVA Logo">
+        </div>
+    """, unsafe_allow_html=True)
+    return True
+
@@ -4,6 +4,9 @@ SQL query templates for MIND Platform analytics
 """
 
 from datetime import datetime, timedelta
+from typing import Optional
+
+from utils.lazy_query import LazyQuery
 
 # Hardcode DATASET_ID to avoid circular imports
 DATASET_ID = "gen-lang-client-0625543859.mind_analytics"
@@ -21,12 +24,13 @@ class QueryBuilder:
         """
     
     @staticmethod
-    def get_active_users(days: int = 30) -> str:
-        """Get active users in last N days"""
+    def get_active_users(days: Optional[int] = 30) -> str:
+        """Get active users in last N days (all time if days is None)"""
+        where = "" if days is None else f"WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {int(days)} DAY)"
         return f"""
         SELECT COUNT(DISTINCT user_id) as active_users
         FROM `{DATASET_ID}.sessions`
-        WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)
+        {where}
         """
     
     @staticmethod
@@ -67,7 +71,9 @@ class QueryBuilder:
             COUNTIF(derived_is_error = TRUE) as error_count,
             ROUND(AVG(derived_response_time_ms), 2) as avg_response_time,
             ROUND(APPROX_QUANTILES(derived_response_time_ms, 100)[OFFSET(95)], 2) as p95_latency,
-            ROUND(APPROX_QUANTILES(derived_response_time_ms, 100)[OFFSET(99)], 2) as p99_latency
+            ROUND(APPROX_QUANTILES(derived_response_time_ms, 100)[OFFSET(99)], 2) as p99_latency,
+            SAFE_DIVIDE(COUNTIF(derived_is_error = TRUE), COUNT(*)) * 100 as error_rate_pct,
+            100 - SAFE_DIVIDE(COUNTIF(derived_is_error = TRUE), COUNT(*)) * 100 as uptime_pct
         FROM `{DATASET_ID}.backend_telemetry`
         WHERE created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
         """
@@ -86,34 +92,25 @@ class QueryBuilder:
         """
     
     @staticmethod
-    def get_daily_active_users(days: int = 30) -> str:
-        """Get daily active users trend"""
+    def get_daily_active_users(days: Optional[int] = 30) -> str:
+        """Get daily active users trend (from materialized view, all time if days is None)"""
+        where = "" if days is None else f"WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL {int(days)} DAY)"
         return f"""
         SELECT 
-            DATE(start_time) as date,
+            date,
             COUNT(DISTINCT user_id) as active_users
-        FROM `{DATASET_ID}.sessions`
-        WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)
+        FROM `{DATASET_ID}.mv_daily_user_sessions`
+        {where}
         GROUP BY date
         ORDER BY date
         """
     
     @staticmethod
     def get_grade_distribution() -> str:
-        """Get grade distribution"""
+        """Get grade distribution (from materialized view)"""
         return f"""
-        SELECT 
-            CASE 
-                WHEN final_score >= 90 THEN 'A (90-100)'
-                WHEN final_score >= 80 THEN 'B (80-89)'
-                WHEN final_score >= 70 THEN 'C (70-79)'
-                WHEN final_score >= 60 THEN 'D (60-69)'
-                ELSE 'F (Below 60)'
-            END as grade_bracket,
-            COUNT(*) as count
-        FROM `{DATASET_ID}.grades`
-        WHERE final_score IS NOT NULL
-        GROUP BY grade_bracket
+        SELECT grade_bracket, count
+        FROM `{DATASET_ID}.mv_grade_distribution`
         ORDER BY grade_bracket
         """
     
@@ -138,8 +135,19 @@ class QueryBuilder:
     @staticmethod
     def get_student_performance(user_id: str = None) -> str:
         """Get individual student performance"""
+        return QueryBuilder.get_student_performance_query(user_id).to_sql()
+    
+    @staticmethod
+    def get_student_performance_query(user_id: str = None, search: str = None,
+                                      limit: int = None) -> LazyQuery:
+        """
+        Get individual student performance as a LazyQuery
+        
+        Callers can add filters, columns and limits that BigQuery evaluates
+        before any rows are returned
+        """
         user_filter = f"AND g.user_id = '{user_id}'" if user_id else ""
-        return f"""
+        query = LazyQuery(f"""
         SELECT 
             u.name as student_name,
             u.student_email,
@@ -155,22 +163,35 @@ class QueryBuilder:
         JOIN `{DATASET_ID}.user` u ON g.user_id = u.user_id
         WHERE g.final_score IS NOT NULL {user_filter}
         GROUP BY u.name, u.student_email, u.department, u.cohort
-        ORDER BY avg_score DESC
-        """
+        """).order_by("avg_score DESC")
+        
+        if search:
+            query = query.filter(
+                "STRPOS(LOWER(student_name), @search) > 0 "
+                "OR STRPOS(LOWER(student_email), @search) > 0",
+                search=search.lower()
+            )
+        if limit:
+            query = query.limit(limit)
+        return query
+    
+    @staticmethod
+    def get_top_performers(n: int = 10) -> str:
+        """Get the top N students by average score, limited in BigQuery"""
+        return QueryBuilder.get_student_performance_query(limit=n).to_sql()
     
     @staticmethod
     def get_session_engagement() -> str:
-        """Get session engagement metrics"""
+        """Get session engagement metrics (from materialized view)"""
         return f"""
         SELECT 
-            DATE(start_timestamp) as date,
-            COUNT(*) as total_sessions,
-            ROUND(AVG(session_duration_seconds / 60.0), 2) as avg_duration_minutes,
-            COUNTIF(is_bounce = TRUE) as bounce_sessions,
-            ROUND(AVG(pageview_count), 2) as avg_pageviews
-        FROM `{DATASET_ID}.session_analytics`
-        WHERE start_timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
-        GROUP BY date
+            date,
+            total_sessions,
+            ROUND(avg_duration_minutes, 2) as avg_duration_minutes,
+            bounce_sessions,
+            ROUND(avg_pageviews, 2) as avg_pageviews
+        FROM `{DATASET_ID}.mv_daily_session_engagement`
+        WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)
         ORDER BY date
         """
     
@@ -206,6 +227,33 @@ class QueryBuilder:
         ORDER BY request_count DESC
         """
     
+    @staticmethod
+    def get_ai_dashboard_bundle() -> str:
+        """
+        Get AI token totals and per-model usage in a single table scan
+        
+        Rows are tagged by 'kind': one 'totals' row (the ROLLUP grand total)
+        followed by one 'per_model' row per model, ordered by request count.
+        Totals only count requests with token data, as in get_ai_token_usage().
+        """
+        return f"""
+        SELECT 
+            IF(GROUPING(derived_ai_model) = 1, 'totals', 'per_model') as kind,
+            derived_ai_model as model,
+            IF(GROUPING(derived_ai_model) = 1, NULL, COUNT(*)) as request_count,
+            SUM(derived_ai_total_tokens) as total_tokens,
+            IF(GROUPING(derived_ai_model) = 1, SUM(IF(derived_ai_total_tokens IS NOT NULL, derived_ai_input_tokens, NULL)), NULL) as input_tokens,
+            IF(GROUPING(derived_ai_model) = 1, SUM(IF(derived_ai_total_tokens IS NOT NULL, derived_ai_output_tokens, NULL)), NULL) as output_tokens,
+            IF(GROUPING(derived_ai_model) = 1, COUNT(DISTINCT IF(derived_ai_total_tokens IS NOT NULL, derived_ai_model, NULL)), NULL) as models_used,
+            IF(GROUPING(derived_ai_model) = 1, NULL, ROUND(AVG(derived_ai_total_tokens), 2)) as avg_tokens_per_request
+        FROM `{DATASET_ID}.backend_telemetry`
+        WHERE derived_ai_model IS NOT NULL OR derived_ai_total_tokens IS NOT NULL
+        GROUP BY ROLLUP(derived_ai_model)
+        -- Requests with tokens but no model only count towards the totals
+        HAVING GROUPING(derived_ai_model) = 1 OR derived_ai_model IS NOT NULL
+        ORDER BY kind DESC, request_count DESC
+        """
+    
     @staticmethod
     def get_response_time_by_route() -> str:
         """Get response time by API route"""